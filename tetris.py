@@ -47,104 +47,228 @@ SHAPES = {
 
 LINE_SCORES = [0, 100, 300, 500, 800]
 
+# Small-int color indices for locked cells (0 = empty); the occupancy
+# bitmasks drive collision while this drives rendering only.
+COLOR_INDEX = {name: i for i, name in enumerate(SHAPES, start=1)}
+
+FULL_ROW = (1 << COLS) - 1
+
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
 def rotate(shape):
     return [list(row) for row in zip(*shape[::-1])]
 
+def shape_masks(shape):
+    """Row bitmasks for a shape: bit c is set where shape[r][c] is filled."""
+    return [sum(1 << c for c, cell in enumerate(row) if cell) for row in shape]
+
+def column_profile(shape):
+    """(tops, bottoms): first and last filled row offset per shape column."""
+    cols = range(len(shape[0]))
+    tops = [min(r for r, row in enumerate(shape) if row[c]) for c in cols]
+    bottoms = [max(r for r, row in enumerate(shape) if row[c]) for c in cols]
+    return tops, bottoms
+
+def _build_rotations():
+    """All distinct rotations per piece (O has 1, I/S/Z have 2, rest 4)."""
+    shapes, masks, cells, tops, bottoms = {}, {}, {}, {}, {}
+    for name, shape in SHAPES.items():
+        rots = [shape]
+        nxt = rotate(shape)
+        while nxt != shape:
+            rots.append(nxt)
+            nxt = rotate(nxt)
+        shapes[name] = rots
+        masks[name] = [shape_masks(s) for s in rots]
+        cells[name] = [[(r, c) for r, row in enumerate(s)
+                        for c, cell in enumerate(row) if cell] for s in rots]
+        profiles = [column_profile(s) for s in rots]
+        tops[name] = [p[0] for p in profiles]
+        bottoms[name] = [p[1] for p in profiles]
+    return shapes, masks, cells, tops, bottoms
+
+ROTATIONS, ROT_MASKS, ROT_CELLS, ROT_TOPS, ROT_BOTTOMS = _build_rotations()
+
+class Piece:
+    __slots__ = ('name', 'color', 'shape', 'rows', 'cells', 'rot', 'x', 'y')
+
+    def __init__(self, name):
+        self.name = name
+        self.color = COLOR_INDEX[name]
+        self.shape = ROTATIONS[name][0]
+        self.rows = ROT_MASKS[name][0]
+        self.cells = ROT_CELLS[name][0]
+        self.rot = 0
+        self.x = COLS // 2 - len(self.shape[0]) // 2
+        self.y = 0
+
+# 7-bag randomizer: deal all seven pieces in shuffled order before
+# reshuffling, as modern Tetris does.
+_BAG_NAMES = list(SHAPES)
+_bag = []
+
 def new_piece():
-    name = random.choice(list(SHAPES))
-    shape = [row[:] for row in SHAPES[name]]
-    return {'name': name, 'shape': shape,
-            'x': COLS // 2 - len(shape[0]) // 2, 'y': 0}
-
-def valid(board, piece, dx=0, dy=0, shape=None):
-    s = shape or piece['shape']
-    for r, row in enumerate(s):
-        for c, cell in enumerate(row):
-            if cell:
-                nx = piece['x'] + c + dx
-                ny = piece['y'] + r + dy
-                if nx < 0 or nx >= COLS or ny >= ROWS:
-                    return False
-                if ny >= 0 and board[ny][nx]:
-                    return False
-    return True
-
-def lock(board, piece):
-    for r, row in enumerate(piece['shape']):
-        for c, cell in enumerate(row):
-            if cell:
-                board[piece['y'] + r][piece['x'] + c] = piece['name']
-
-def clear_lines(board):
-    full = [r for r, row in enumerate(board) if all(row)]
-    for r in full:
-        del board[r]
-        board.insert(0, [0] * COLS)
-    return len(full)
-
-def ghost_y(board, piece):
-    gy = piece['y']
-    while valid(board, {**piece, 'y': gy + 1}):
-        gy += 1
-    return gy
-
-def level_interval(level):
-    """Frames between automatic drops."""
-    return max(2, 48 - (level - 1) * 4)
+    if not _bag:
+        _bag[:] = _BAG_NAMES
+        random.shuffle(_bag)
+    return Piece(_bag.pop())
+
+def valid(board, rows, x, y):
+    """True iff the masked rows fit at (x, y); stops at the first row
+    that runs off the right edge or overlaps the board."""
+    if x < 0 or y + len(rows) > ROWS:
+        return False
+    return not any((shifted := bits << x) & ~FULL_ROW
+                   or (y + i >= 0 and board[y + i] & shifted)
+                   for i, bits in enumerate(rows))
+
+def lock(board, color_board, heights, piece):
+    x, y, color = piece.x, piece.y, piece.color
+    for i, bits in enumerate(piece.rows):
+        board[y + i] |= bits << x
+    for r, c in piece.cells:
+        color_board[(y + r) * COLS + x + c] = color
+    for c, t in enumerate(ROT_TOPS[piece.name][piece.rot]):
+        if y + t < heights[x + c]:
+            heights[x + c] = y + t
+
+def column_heights(board):
+    """Topmost filled row per column (ROWS for an empty column)."""
+    heights = [ROWS] * COLS
+    for c in range(COLS):
+        bit = 1 << c
+        for r in range(ROWS):
+            if board[r] & bit:
+                heights[c] = r
+                break
+    return heights
+
+def clear_lines(board, color_board):
+    cleared = 0
+    w = ROWS - 1
+    for r in range(ROWS - 1, -1, -1):
+        if board[r] == FULL_ROW:
+            cleared += 1
+        else:
+            if w != r:
+                board[w] = board[r]
+                color_board[w * COLS:(w + 1) * COLS] = \
+                    color_board[r * COLS:(r + 1) * COLS]
+            w -= 1
+    for r in range(w, -1, -1):
+        board[r] = 0
+        color_board[r * COLS:(r + 1) * COLS] = bytes(COLS)
+    return cleared
+
+def spawn_blocked(board, piece):
+    """Game-over test: spawn position is always in bounds, so a plain
+    AND against the board rows is enough."""
+    x, y = piece.x, piece.y
+    return any(board[y + i] & (bits << x)
+               for i, bits in enumerate(piece.rows))
+
+def ghost_y(board, heights, piece):
+    x, y = piece.x, piece.y
+    bottoms = ROT_BOTTOMS[piece.name][piece.rot]
+    drop = min(heights[x + c] - b for c, b in enumerate(bottoms)) - 1 - y
+    if drop < 0:
+        # Piece was tucked under an overhang, below the recorded column
+        # tops; probe row by row as before.
+        gy = y
+        while valid(board, piece.rows, x, gy + 1):
+            gy += 1
+        return gy
+    return y + drop
+
+# Seconds between automatic drops, indexed by level; levels past the
+# table end are all at the 2-frame floor anyway.
+LEVEL_INTERVAL_SEC = [max(2, 48 - (lv - 1) * 4) / FPS for lv in range(64)]
 
 # ── Drawing ───────────────────────────────────────────────────────────────────
 
-def draw_cell(surf, x, y, color, alpha=255):
-    rect = pygame.Rect(x * CELL, y * CELL, CELL - 1, CELL - 1)
-    if alpha < 255:
-        s = pygame.Surface((CELL - 1, CELL - 1), pygame.SRCALPHA)
-        s.fill((*color, alpha))
-        surf.blit(s, rect.topleft)
-    else:
-        pygame.draw.rect(surf, color, rect, border_radius=3)
-        highlight = tuple(min(255, v + 60) for v in color)
-        pygame.draw.rect(surf, highlight, rect, width=2, border_radius=3)
-
-def draw_board(surf, board):
-    # Background grid
+# Cell sprites (indexed by color index, 0 unused) and static board
+# background, rendered once by make_sprites() after display init.
+CELL_SURF = []
+GHOST_SURF = None
+EMPTY_SURF = None
+BG_SURF = None
+
+def make_cell(color):
+    s = pygame.Surface((CELL - 1, CELL - 1))
+    s.fill(DARK)
+    rect = s.get_rect()
+    pygame.draw.rect(s, color, rect, border_radius=3)
+    highlight = tuple(min(255, v + 60) for v in color)
+    pygame.draw.rect(s, highlight, rect, width=2, border_radius=3)
+    return s.convert()
+
+def make_sprites():
+    global GHOST_SURF, EMPTY_SURF, BG_SURF
+    CELL_SURF[:] = [None] + [make_cell(COLORS[name]) for name in SHAPES]
+    g = pygame.Surface((CELL - 1, CELL - 1), pygame.SRCALPHA)
+    pygame.draw.rect(g, GHOST, g.get_rect(), width=2, border_radius=3)
+    GHOST_SURF = g.convert_alpha()
+    e = pygame.Surface((CELL - 1, CELL - 1))
+    e.fill(DARK)
+    pygame.draw.rect(e, GREY, e.get_rect(), border_radius=2)
+    EMPTY_SURF = e.convert()
+    bg = pygame.Surface((COLS * CELL, H))
+    bg.fill(DARK)
     for r in range(ROWS):
         for c in range(COLS):
-            pygame.draw.rect(surf, GREY,
-                             (c * CELL, r * CELL, CELL - 1, CELL - 1),
-                             border_radius=2)
-            cell = board[r][c]
-            if cell:
-                draw_cell(surf, c, r, COLORS[cell])
-
-def draw_piece(surf, piece, color=None, gy=None):
-    y_offset = gy if gy is not None else piece['y']
-    col = color or COLORS[piece['name']]
-    for r, row in enumerate(piece['shape']):
-        for c, cell in enumerate(row):
-            if cell:
-                draw_cell(surf, piece['x'] + c, y_offset + r, col)
-
-def draw_ghost(surf, board, piece):
-    gy = ghost_y(board, piece)
-    if gy == piece['y']:
-        return
-    for r, row in enumerate(piece['shape']):
-        for c, cell in enumerate(row):
-            if cell:
-                rect = pygame.Rect((piece['x'] + c) * CELL,
-                                   (gy + r) * CELL, CELL - 1, CELL - 1)
-                pygame.draw.rect(surf, GHOST, rect, width=2, border_radius=3)
-
-def draw_sidebar(surf, font, big_font, next_piece, score, level, lines, paused):
-    ox = COLS * CELL
+            bg.blit(EMPTY_SURF, (c * CELL, r * CELL))
+    BG_SURF = bg.convert()
+
+def draw_board(surf, color_board):
+    # The empty grid comes from BG_SURF; only overlay filled cells.
+    surf.blit(BG_SURF, (0, 0))
+    i = 0
+    for r in range(ROWS):
+        for c in range(COLS):
+            ci = color_board[i]
+            if ci:
+                surf.blit(CELL_SURF[ci], (c * CELL, r * CELL))
+            i += 1
+
+def draw_piece_with_ghost(surf, piece, gy):
+    """One walk over the shape, blitting the piece and (when the ghost
+    has actually dropped away from it) the ghost outline."""
+    x, y = piece.x, piece.y
+    sprite = CELL_SURF[piece.color]
+    show_ghost = gy != y
+    for r, c in piece.cells:
+        if show_ghost:
+            surf.blit(GHOST_SURF, ((x + c) * CELL, (gy + r) * CELL))
+        surf.blit(sprite, ((x + c) * CELL, (y + r) * CELL))
+
+def piece_rect(piece, gy):
+    """Screen rect spanning the piece and its ghost (ghost sits below)."""
+    shape = piece.shape
+    return pygame.Rect(piece.x * CELL, piece.y * CELL,
+                       len(shape[0]) * CELL,
+                       (gy - piece.y + len(shape)) * CELL)
+
+# Rendered-text cache: font rasterization is expensive and the sidebar
+# repeats the same strings for many frames in a row.
+_text_cache = {}
+
+def render_text(font, s, color):
+    key = (s, id(font), color)
+    cached = _text_cache.get(key)
+    if cached is None:
+        cached = _text_cache[key] = font.render(s, True, color)
+    return cached
+
+def draw_sidebar(surf, font, big_font, small_font,
+                 next_piece, score, level, lines, paused):
+    """Render the sidebar into its own SIDEBAR x H surface."""
+    ox = 0
     # Background
-    pygame.draw.rect(surf, DARK, (ox, 0, SIDEBAR, H))
-    pygame.draw.line(surf, GREY, (ox, 0), (ox, H), 2)
+    surf.fill(DARK)
+    pygame.draw.line(surf, GREY, (0, 0), (0, H), 2)
 
     def text(s, x, y, f=font, color=WHITE):
-        surf.blit(f.render(s, True, color), (ox + x, y))
+        surf.blit(render_text(f, s, color), (ox + x, y))
 
     text('TETRIS', 20, 18, big_font, (0, 220, 220))
 
@@ -159,19 +283,13 @@ def draw_sidebar(surf, font, big_font, next_piece, score, level, lines, paused):
 
     text('NEXT', 20, 295)
     # Draw next piece preview
-    ns = next_piece['shape']
+    ns = next_piece.shape
     pw = len(ns[0]) * CELL
     start_x = ox + (SIDEBAR - pw) // 2
     start_y = 325
-    for r, row in enumerate(ns):
-        for c, cell in enumerate(row):
-            if cell:
-                rect = pygame.Rect(start_x + c * CELL, start_y + r * CELL,
-                                   CELL - 1, CELL - 1)
-                color = COLORS[next_piece['name']]
-                pygame.draw.rect(surf, color, rect, border_radius=3)
-                highlight = tuple(min(255, v + 60) for v in color)
-                pygame.draw.rect(surf, highlight, rect, width=2, border_radius=3)
+    sprite = CELL_SURF[next_piece.color]
+    for r, c in next_piece.cells:
+        surf.blit(sprite, (start_x + c * CELL, start_y + r * CELL))
 
     # Controls
     controls = [
@@ -183,16 +301,13 @@ def draw_sidebar(surf, font, big_font, next_piece, score, level, lines, paused):
         ('Q',   'Quit'),
     ]
     cy = H - 175
-    small = pygame.font.SysFont('consolas', 14)
     for key, action in controls:
-        k = small.render(key, True, (200, 200, 255))
-        a = small.render(action, True, (160, 160, 160))
-        surf.blit(k, (ox + 15, cy))
-        surf.blit(a, (ox + 70, cy))
+        surf.blit(render_text(small_font, key, (200, 200, 255)), (ox + 15, cy))
+        surf.blit(render_text(small_font, action, (160, 160, 160)), (ox + 70, cy))
         cy += 22
 
     if paused:
-        s = big_font.render('PAUSED', True, (255, 220, 0))
+        s = render_text(big_font, 'PAUSED', (255, 220, 0))
         surf.blit(s, (ox + SIDEBAR // 2 - s.get_width() // 2, H // 2 - 20))
 
 # ── Main ──────────────────────────────────────────────────────────────────────
@@ -209,35 +324,50 @@ def main():
     pygame.init()
     surf = pygame.display.set_mode((W, H))
     pygame.display.set_caption('Tetris')
+    # Only QUIT and KEYDOWN are ever handled; block everything else at
+    # the source so the queue never fills with mouse/window noise.
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
+    make_sprites()
     clock = pygame.time.Clock()
 
-    font     = pygame.font.SysFont('consolas', 20)
-    big_font = pygame.font.SysFont('consolas', 28, bold=True)
+    font       = pygame.font.SysFont('consolas', 20)
+    big_font   = pygame.font.SysFont('consolas', 28, bold=True)
+    small_font = pygame.font.SysFont('consolas', 14)
+
+    sidebar_surf = pygame.Surface((SIDEBAR, H))
 
     # ── Start screen ──
     show_screen(surf, font, big_font, 'TETRIS', 'Press any key to start', (0, 220, 220))
     waiting = True
     while waiting:
-        for e in pygame.event.get():
+        for e in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
             if e.type == pygame.QUIT:
                 pygame.quit(); sys.exit()
             if e.type == pygame.KEYDOWN:
                 waiting = False
 
     while True:  # restart loop
-        board = [[0] * COLS for _ in range(ROWS)]
+        board = [0] * ROWS
+        color_board = bytearray(ROWS * COLS)
+        heights = [ROWS] * COLS
         piece = new_piece()
         next_piece = new_piece()
         score, level, total_lines = 0, 1, 0
-        fall_timer = 0
+        fall_timer = 0.0
         paused = False
         game_over = False
+        sidebar_state = None
+        board_rect = pygame.Rect(0, 0, COLS * CELL, H)
+        sidebar_rect = pygame.Rect(COLS * CELL, 0, SIDEBAR, H)
+        board_dirty = True   # full repaint on the first frame
+        prev_active_rect = None
+        needs_redraw = True
 
         while not game_over:
-            clock.tick(FPS)
-            fall_timer += 1
+            dt = clock.tick(FPS) / 1000.0
 
-            for e in pygame.event.get():
+            for e in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
                 if e.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 if e.type == pygame.KEYDOWN:
@@ -245,67 +375,109 @@ def main():
                         pygame.quit(); sys.exit()
                     if e.key == pygame.K_p:
                         paused = not paused
+                        needs_redraw = True
                     if paused:
                         continue
-                    if e.key == pygame.K_LEFT and valid(board, piece, dx=-1):
-                        piece['x'] -= 1
-                    if e.key == pygame.K_RIGHT and valid(board, piece, dx=1):
-                        piece['x'] += 1
+                    if e.key == pygame.K_LEFT and \
+                            valid(board, piece.rows, piece.x - 1, piece.y):
+                        piece.x -= 1
+                        needs_redraw = True
+                    if e.key == pygame.K_RIGHT and \
+                            valid(board, piece.rows, piece.x + 1, piece.y):
+                        piece.x += 1
+                        needs_redraw = True
                     if e.key == pygame.K_UP:
-                        rotated = rotate(piece['shape'])
-                        if valid(board, piece, shape=rotated):
-                            piece['shape'] = rotated
+                        rots = ROT_MASKS[piece.name]
+                        nxt = (piece.rot + 1) % len(rots)
+                        if valid(board, rots[nxt], piece.x, piece.y):
+                            piece.rot = nxt
+                            piece.rows = rots[nxt]
+                            piece.shape = ROTATIONS[piece.name][nxt]
+                            piece.cells = ROT_CELLS[piece.name][nxt]
+                            needs_redraw = True
                     if e.key == pygame.K_DOWN:
-                        if valid(board, piece, dy=1):
-                            piece['y'] += 1
+                        if valid(board, piece.rows, piece.x, piece.y + 1):
+                            piece.y += 1
                             score += 1
-                            fall_timer = 0
+                            fall_timer = 0.0
+                            needs_redraw = True
                     if e.key == pygame.K_SPACE:
-                        while valid(board, piece, dy=1):
-                            piece['y'] += 1
+                        while valid(board, piece.rows, piece.x, piece.y + 1):
+                            piece.y += 1
                             score += 2
-                        fall_timer = level_interval(level) + 1  # force lock
+                        # force lock on this frame's gravity check
+                        fall_timer = LEVEL_INTERVAL_SEC[min(level, 63)]
+                        needs_redraw = True
 
             if paused:
-                # Still draw while paused
-                surf.fill(DARK)
-                draw_board(surf, board)
-                draw_ghost(surf, board, piece)
-                draw_piece(surf, piece)
-                draw_sidebar(surf, font, big_font, next_piece, score, level, total_lines, True)
-                pygame.display.flip()
+                # Gravity is frozen; one repaint for the PAUSED banner,
+                # then nothing until the next key.
+                if needs_redraw:
+                    draw_board(surf, color_board)
+                    draw_piece_with_ghost(surf, piece,
+                                          ghost_y(board, heights, piece))
+                    draw_sidebar(sidebar_surf, font, big_font, small_font,
+                                 next_piece, score, level, total_lines, True)
+                    sidebar_state = None
+                    surf.blit(sidebar_surf, (COLS * CELL, 0))
+                    pygame.display.update((board_rect, sidebar_rect))
+                    needs_redraw = False
                 continue
 
-            # Gravity
-            if fall_timer >= level_interval(level):
-                fall_timer = 0
-                if valid(board, piece, dy=1):
-                    piece['y'] += 1
+            # Gravity, integrated over real elapsed time
+            fall_timer += dt
+            if fall_timer >= LEVEL_INTERVAL_SEC[min(level, 63)]:
+                fall_timer = 0.0
+                needs_redraw = True
+                if valid(board, piece.rows, piece.x, piece.y + 1):
+                    piece.y += 1
                 else:
-                    lock(board, piece)
-                    cleared = clear_lines(board)
+                    lock(board, color_board, heights, piece)
+                    cleared = clear_lines(board, color_board)
+                    board_dirty = True
+                    if cleared:
+                        heights[:] = column_heights(board)
                     total_lines += cleared
                     score += LINE_SCORES[cleared] * level
                     level = total_lines // 10 + 1
                     piece = next_piece
                     next_piece = new_piece()
-                    if not valid(board, piece):
+                    if spawn_blocked(board, piece):
                         game_over = True
 
-            # Draw
-            surf.fill(DARK)
-            draw_board(surf, board)
-            draw_ghost(surf, board, piece)
-            draw_piece(surf, piece)
-            draw_sidebar(surf, font, big_font, next_piece, score, level, total_lines, False)
-            pygame.display.flip()
+            if not needs_redraw:
+                continue
+            needs_redraw = False
+
+            # Draw, then push only the regions that changed on screen
+            dirty = []
+            gy = ghost_y(board, heights, piece)
+            active_rect = piece_rect(piece, gy)
+            draw_board(surf, color_board)
+            draw_piece_with_ghost(surf, piece, gy)
+            if board_dirty:
+                dirty.append(board_rect)
+                board_dirty = False
+            else:
+                if prev_active_rect is not None:
+                    dirty.append(prev_active_rect)
+                dirty.append(active_rect)
+            prev_active_rect = active_rect
+            state = (score, level, total_lines, next_piece.name, False)
+            if state != sidebar_state:
+                draw_sidebar(sidebar_surf, font, big_font, small_font,
+                             next_piece, score, level, total_lines, False)
+                sidebar_state = state
+                dirty.append(sidebar_rect)
+            surf.blit(sidebar_surf, (COLS * CELL, 0))
+            pygame.display.update(dirty)
 
         # Game over
         show_screen(surf, font, big_font,
                     'GAME OVER', f'Score: {score}   Press any key to restart', (220, 50, 50))
         waiting = True
         while waiting:
-            for e in pygame.event.get():
+            for e in pygame.event.get((pygame.QUIT, pygame.KEYDOWN)):
                 if e.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 if e.type == pygame.KEYDOWN: